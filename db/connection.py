@@ -1,5 +1,10 @@
 import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
 import psycopg2
+import psycopg2.pool
 
 from dotenv import load_dotenv
 
@@ -35,3 +40,76 @@ def get_connection() -> psycopg2.extensions.connection:
         print("Error connecting to the database:", e)
         return None # type: ignore
 
+
+_connection_pool: Optional[psycopg2.pool.ThreadedConnectionPool] = None
+_pool_slots: Optional[threading.BoundedSemaphore] = None
+_pool_lock = threading.Lock()
+
+
+def get_connection_pool(min_connections: int = 1, max_connections: int = 10) -> Tuple[psycopg2.pool.ThreadedConnectionPool, threading.BoundedSemaphore]:
+    """
+    Returns the shared thread-safe connection pool, creating it on first use with the
+    same environment variables as get_connection.
+
+    Args:
+        min_connections (int, optional): Connections opened up front. Defaults to 1.
+        max_connections (int, optional): Upper bound on open connections. Defaults to 10.
+            Both are only used when the pool is created.
+
+    Returns:
+        pool (psycopg2.pool.ThreadedConnectionPool): The shared connection pool.
+        slots (threading.BoundedSemaphore): Limits borrowers to the pool size. Returned together
+            with the pool so a concurrent close_connection_pool cannot leave them mismatched.
+    """
+    global _connection_pool, _pool_slots
+
+    with _pool_lock:
+        if _connection_pool is None or _pool_slots is None:
+            _connection_pool = psycopg2.pool.ThreadedConnectionPool(
+                min_connections,
+                max_connections,
+                dbname=os.getenv('DB_NAME'),
+                user=os.getenv('DB_USER'),
+                password=os.getenv('DB_PASSWORD'),
+                host=os.getenv('DB_HOST'),
+                port=os.getenv('DB_PORT')
+            )
+            # Makes callers wait for a free connection instead of raising PoolError
+            _pool_slots = threading.BoundedSemaphore(max_connections)
+        return _connection_pool, _pool_slots
+
+
+@contextmanager
+def pooled_connection() -> Iterator[psycopg2.extensions.connection]:
+    """
+    Borrows a connection from the shared pool and returns it when the block exits.
+    Any open transaction is rolled back by the pool when the connection is returned.
+    If the pool was closed in the meantime, the connection is closed instead.
+
+    Yields:
+        connection (psycopg2.extensions.connection): The borrowed database connection.
+    """
+    pool, slots = get_connection_pool()
+    with slots:
+        connection = pool.getconn()
+        try:
+            yield connection
+        finally:
+            try:
+                pool.putconn(connection)
+            except psycopg2.pool.PoolError:
+                # close_connection_pool ran while the connection was borrowed
+                connection.close()
+
+
+def close_connection_pool() -> None:
+    """
+    Closes every connection of the shared pool so the next call to get_connection_pool starts fresh.
+    """
+    global _connection_pool, _pool_slots
+
+    with _pool_lock:
+        if _connection_pool is not None:
+            _connection_pool.closeall()
+        _connection_pool = None
+        _pool_slots = None
@@ -1,4 +1,4 @@
-from scripts import demand_identification,query_port_coordinates,plot_generations
+from scripts import demand_identification,query_port_coordinates,plot_generations,demand_forecasting
 main_port_name="Long Beach"
 port_code = "USLGB"  # Example port code for Long Beach Port
 width = 0.5  # Width of the bounding box in decimal degrees
@@ -15,6 +15,10 @@ unique_vessels_hourly_df.to_csv("./output_file_after_analysis/hourly_time_and_ve
 # daily analysis
 unique_vessels_daily_df = demand_identification.count_unique_vessels_by_time(main_port_name,port_code, width, height, cargo_vessel_types, time_interval='d')
 unique_vessels_daily_df.to_csv("./output_file_after_analysis/daily_time_and_vessels_analysis.csv")
+
+# next week hourly forecast, add more ports to the dictionary to forecast them together
+hourly_forecast_df = demand_forecasting.forecast_port_demand({main_port_name: unique_vessels_hourly_df}, horizon=24 * 7, time_interval='h')
+hourly_forecast_df.to_csv("./output_file_after_analysis/hourly_vessels_forecast.csv")
 # Example usage
 # Assuming unique_vessels_count is the DataFrame containing hourly unique vessel counts
 plot_generations.plot_demand_variation_plotly(unique_vessels_hourly_df, file_name_to_save="variance_plot_hourly.png",time_resolution='h')
@@ -0,0 +1,68 @@
+import argparse
+import time
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from scripts.demand_forecasting import FORECAST_MODELS, backtest_forecasts, forecast_port_demand
+
+
+def generate_synthetic_port_series(n_ports: int, n_days: int, seed: int = 0) -> Dict[str, pd.DataFrame]:
+    """
+    Generate hourly unique vessel counts with daily and weekly seasonality for many ports.
+
+    Args:
+        n_ports (int): The number of ports to generate.
+        n_days (int): The number of days of hourly data per port.
+        seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+        Dict[str, pandas.DataFrame]: Mapping of port name to a DataFrame in the
+            count_unique_vessels_by_time output format.
+    """
+    rng = np.random.default_rng(seed)
+    time_index = pd.date_range('2020-01-01', periods=n_days * 24, freq='h')
+    hours = time_index.hour.to_numpy()
+    days = time_index.dayofweek.to_numpy()
+
+    base = rng.uniform(5, 40, size=(n_ports, 1))
+    daily_amplitude = rng.uniform(0.1, 0.4, size=(n_ports, 1)) * base
+    weekly_amplitude = rng.uniform(0.0, 0.2, size=(n_ports, 1)) * base
+    expected = (base
+                + daily_amplitude * np.sin(2 * np.pi * hours / 24)
+                + weekly_amplitude * np.cos(2 * np.pi * days / 7))
+    counts = rng.poisson(np.clip(expected, 0, None))
+
+    return {f"Port {i}": pd.DataFrame({'BaseDateTime': time_index, 'UniqueVessels': counts[i]})
+            for i in range(n_ports)}
+
+
+def main() -> None:
+    """
+    Backtests every forecast model on synthetic ports and reports accuracy and runtime.
+
+    This function reads its options from the command line and does not return anything.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark batch port demand forecasting")
+    parser.add_argument('--ports', type=int, default=500, help="Number of synthetic ports")
+    parser.add_argument('--days', type=int, default=56, help="Days of hourly history per port")
+    parser.add_argument('--horizon', type=int, default=168, help="Hours held out and forecast")
+    parser.add_argument('--jobs', type=int, default=1, help="Worker processes used to fit the models")
+    args = parser.parse_args()
+
+    port_series = generate_synthetic_port_series(args.ports, args.days)
+    print(f"Backtesting {args.ports} ports, {args.days} days of hourly history, {args.horizon} hour horizon")
+
+    for model_name in FORECAST_MODELS:
+        result = backtest_forecasts(port_series, args.horizon, time_interval='h', model_name=model_name, n_jobs=args.jobs)
+        print(f"{model_name:>18}: MAE {result['mae']:.3f}  RMSE {result['rmse']:.3f}  fit {result['fit_seconds']:.3f}s")
+
+    # End to end refit, including stacking the series and writing the long format output
+    start = time.perf_counter()
+    forecast_port_demand(port_series, args.horizon, time_interval='h', n_jobs=args.jobs)
+    print(f"End to end refit of {args.ports} ports: {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
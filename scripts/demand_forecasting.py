@@ -0,0 +1,337 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+# Season length (in steps) used by the Holt-Winters model for each supported time interval
+SEASON_LENGTHS: Dict[str, int] = {'h': 24, 'd': 7}
+
+FORECAST_MODELS: Tuple[str, ...] = ('seasonal_baseline', 'holt_winters')
+
+
+def stack_port_series(port_series: Dict[str, pd.DataFrame], time_interval: str = 'h') -> Tuple[List[str], pd.DatetimeIndex, np.ndarray]:
+    """
+    Stack the per-port outputs of count_unique_vessels_by_time into a single (port x time) matrix.
+
+    Args:
+        port_series (Dict[str, pandas.DataFrame]): Mapping of port name to a DataFrame with
+            'BaseDateTime' and 'UniqueVessels' columns.
+        time_interval (str, optional): The time interval of the series. Defaults to 'h' but can use 'd'.
+
+    Returns:
+        Tuple[List[str], pandas.DatetimeIndex, numpy.ndarray]: The port names (row order), the shared
+            time index (column order) and the vessel count matrix. Time steps a port has no data for are NaN.
+
+    Raises:
+        ValueError: If no port series are given or the time interval is not supported.
+    """
+    if time_interval not in SEASON_LENGTHS:
+        raise ValueError(f"Unsupported time interval: {time_interval}")
+
+    frames = [df[['BaseDateTime', 'UniqueVessels']].assign(PortName=port_name)
+              for port_name, df in port_series.items() if not df.empty]
+    if not frames:
+        raise ValueError("No port series to stack")
+
+    # Concatenate once and pivot so every port shares the same time axis
+    long_df = pd.concat(frames, ignore_index=True)
+    long_df['BaseDateTime'] = pd.to_datetime(long_df['BaseDateTime']).dt.floor(time_interval)
+    wide_df = long_df.pivot_table(index='PortName', columns='BaseDateTime', values='UniqueVessels', aggfunc='sum')
+
+    time_index = pd.date_range(wide_df.columns.min(), wide_df.columns.max(), freq=time_interval)
+    wide_df = wide_df.reindex(columns=time_index)
+
+    return list(wide_df.index), time_index, wide_df.to_numpy(dtype=float)
+
+
+def _port_means(matrix: np.ndarray) -> np.ndarray:
+    """
+    Average each row of a matrix ignoring NaNs. Rows without observations are 0.
+
+    Args:
+        matrix (numpy.ndarray): A (port x time) matrix.
+
+    Returns:
+        numpy.ndarray: The mean of every row.
+    """
+    observed = ~np.isnan(matrix)
+    counts = observed.sum(axis=1).astype(float)
+    sums = np.where(observed, matrix, 0.0).sum(axis=1)
+
+    return np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+
+
+def _slot_means(values: np.ndarray, slots: np.ndarray, n_slots: int) -> np.ndarray:
+    """
+    Average each row of a matrix over the time steps falling in each seasonal slot, ignoring NaNs.
+
+    Args:
+        values (numpy.ndarray): A (port x time) matrix.
+        slots (numpy.ndarray): The seasonal slot (e.g. hour of day) of every time step.
+        n_slots (int): The number of distinct slots.
+
+    Returns:
+        numpy.ndarray: A (port x slot) matrix of means. Slots without observations are 0.
+    """
+    one_hot = np.zeros((len(slots), n_slots))
+    one_hot[np.arange(len(slots)), slots] = 1.0
+
+    observed = ~np.isnan(values)
+    sums = np.where(observed, values, 0.0) @ one_hot
+    counts = observed.astype(float) @ one_hot
+
+    return np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+
+
+def fit_seasonal_baseline(matrix: np.ndarray, time_index: pd.DatetimeIndex, alpha: float = 0.3) -> Dict[str, np.ndarray]:
+    """
+    Fit hour-of-day and day-of-week profiles plus an exponentially smoothed level to every port at once.
+
+    Args:
+        matrix (numpy.ndarray): The (port x time) vessel count matrix from stack_port_series.
+        time_index (pandas.DatetimeIndex): The time index of the matrix columns.
+        alpha (float, optional): The smoothing factor of the level. Defaults to 0.3.
+
+    Returns:
+        Dict[str, numpy.ndarray]: The fitted 'level' (per port), 'hour_profile' (port x 24)
+            and 'day_profile' (port x 7).
+    """
+    hours = time_index.hour.to_numpy()
+    days = time_index.dayofweek.to_numpy()
+
+    # Center every port on its own mean so the profiles only carry the seasonal shape
+    port_mean = _port_means(matrix)
+    centered = matrix - port_mean[:, None]
+
+    hour_profile = _slot_means(centered, hours, 24)
+    day_profile = _slot_means(centered - hour_profile[:, hours], days, 7)
+
+    # Exponentially smooth the deseasonalized series, one vectorized update per time step
+    deseasonalized = matrix - hour_profile[:, hours] - day_profile[:, days]
+    level = port_mean.copy()
+    for step in range(deseasonalized.shape[1]):
+        observation = deseasonalized[:, step]
+        observed = ~np.isnan(observation)
+        level[observed] = alpha * observation[observed] + (1 - alpha) * level[observed]
+
+    return {'level': level, 'hour_profile': hour_profile, 'day_profile': day_profile}
+
+
+def forecast_seasonal_baseline(model: Dict[str, np.ndarray], future_index: pd.DatetimeIndex) -> np.ndarray:
+    """
+    Forecast vessel counts from a fitted seasonal baseline.
+
+    Args:
+        model (Dict[str, numpy.ndarray]): The output of fit_seasonal_baseline.
+        future_index (pandas.DatetimeIndex): The time steps to forecast.
+
+    Returns:
+        numpy.ndarray: A (port x horizon) matrix of non-negative forecasts.
+    """
+    hours = future_index.hour.to_numpy()
+    days = future_index.dayofweek.to_numpy()
+    forecasts = model['level'][:, None] + model['hour_profile'][:, hours] + model['day_profile'][:, days]
+
+    return np.clip(forecasts, 0.0, None)
+
+
+def fit_holt_winters(matrix: np.ndarray, season_length: int, alpha: float = 0.3, beta: float = 0.05,
+                     gamma: float = 0.1, phi: float = 0.98) -> Dict[str, np.ndarray]:
+    """
+    Fit additive Holt-Winters (damped trend) exponential smoothing to every port at once.
+
+    Args:
+        matrix (numpy.ndarray): The (port x time) vessel count matrix from stack_port_series.
+        season_length (int): The number of time steps in one season (24 for hourly, 7 for daily).
+        alpha (float, optional): The smoothing factor of the level. Defaults to 0.3.
+        beta (float, optional): The smoothing factor of the trend. Defaults to 0.05.
+        gamma (float, optional): The smoothing factor of the seasonal component. Defaults to 0.1.
+        phi (float, optional): The trend damping factor. Defaults to 0.98.
+
+    Returns:
+        Dict[str, numpy.ndarray]: The fitted 'level', 'trend', 'season' (port x season_length),
+            the 'phi' used and the 'next_slot' of the first forecast step.
+    """
+    n_steps = matrix.shape[1]
+
+    # Initialise from the first season, filling its gaps with the port mean
+    port_mean = _port_means(matrix)
+    first_season = matrix[:, :season_length]
+    level = np.where(np.isnan(first_season), port_mean[:, None], first_season).mean(axis=1)
+    trend = np.zeros_like(level)
+    season = np.zeros((matrix.shape[0], season_length))
+    season[:, :first_season.shape[1]] = np.nan_to_num(first_season - level[:, None])
+
+    for step in range(n_steps):
+        slot = step % season_length
+        observation = matrix[:, step]
+        observed = ~np.isnan(observation)
+
+        previous_level = level
+        predicted_level = previous_level + phi * trend
+        fitted_level = alpha * (observation - season[:, slot]) + (1 - alpha) * predicted_level
+        level = np.where(observed, fitted_level, predicted_level)
+        trend = np.where(observed, beta * (level - previous_level) + (1 - beta) * phi * trend, phi * trend)
+        season[:, slot] = np.where(observed, gamma * (observation - level) + (1 - gamma) * season[:, slot], season[:, slot])
+
+    return {'level': level, 'trend': trend, 'season': season, 'phi': np.array(phi), 'next_slot': np.array(n_steps % season_length)}
+
+
+def forecast_holt_winters(model: Dict[str, np.ndarray], horizon: int) -> np.ndarray:
+    """
+    Forecast vessel counts from a fitted Holt-Winters model.
+
+    Args:
+        model (Dict[str, numpy.ndarray]): The output of fit_holt_winters.
+        horizon (int): The number of time steps to forecast.
+
+    Returns:
+        numpy.ndarray: A (port x horizon) matrix of non-negative forecasts.
+    """
+    season_length = model['season'].shape[1]
+    steps = np.arange(1, horizon + 1)
+    damped_steps = np.cumsum(float(model['phi']) ** steps)
+    slots = (int(model['next_slot']) + steps - 1) % season_length
+
+    forecasts = model['level'][:, None] + model['trend'][:, None] * damped_steps + model['season'][:, slots]
+
+    return np.clip(forecasts, 0.0, None)
+
+
+def _forecast_matrix(matrix: np.ndarray, time_index: pd.DatetimeIndex, future_index: pd.DatetimeIndex,
+                     time_interval: str, model_name: str, params: Dict[str, float]) -> np.ndarray:
+    """
+    Fit the requested model to a (port x time) matrix and forecast the future time steps.
+
+    Kept at module level so it can be sent to worker processes.
+    """
+    if model_name == 'seasonal_baseline':
+        return forecast_seasonal_baseline(fit_seasonal_baseline(matrix, time_index, **params), future_index)
+
+    model = fit_holt_winters(matrix, SEASON_LENGTHS[time_interval], **params)
+    return forecast_holt_winters(model, len(future_index))
+
+
+def forecast_matrix(matrix: np.ndarray, time_index: pd.DatetimeIndex, horizon: int, time_interval: str = 'h',
+                    model_name: str = 'seasonal_baseline', n_jobs: int = 1, **params: float) -> Tuple[pd.DatetimeIndex, np.ndarray]:
+    """
+    Forecast every row of a (port x time) matrix, optionally fanning chunks of ports out to worker processes.
+
+    Args:
+        matrix (numpy.ndarray): The (port x time) vessel count matrix from stack_port_series.
+        time_index (pandas.DatetimeIndex): The time index of the matrix columns.
+        horizon (int): The number of time steps to forecast (e.g. 24 for next day or 168 for next week hourly).
+        time_interval (str, optional): The time interval of the series. Defaults to 'h' but can use 'd'.
+        model_name (str, optional): 'seasonal_baseline' or 'holt_winters'. Defaults to 'seasonal_baseline'.
+        n_jobs (int, optional): The number of worker processes. Defaults to 1 (fit in this process).
+        **params (float): Smoothing parameters passed to the model's fit function.
+
+    Returns:
+        Tuple[pandas.DatetimeIndex, numpy.ndarray]: The forecast time index and the (port x horizon) forecasts.
+
+    Raises:
+        ValueError: If the model name is unknown or the horizon is not positive.
+    """
+    if model_name not in FORECAST_MODELS:
+        raise ValueError(f"Unknown forecast model: {model_name}")
+    if horizon < 1:
+        raise ValueError(f"Forecast horizon must be positive, got {horizon}")
+
+    future_index = pd.date_range(time_index[-1], periods=horizon + 1, freq=time_interval)[1:]
+
+    n_chunks = min(n_jobs, matrix.shape[0])
+    if n_chunks <= 1:
+        return future_index, _forecast_matrix(matrix, time_index, future_index, time_interval, model_name, params)
+
+    # Each worker fits a block of ports with the same vectorized code
+    chunks = np.array_split(matrix, n_chunks)
+    with ProcessPoolExecutor(max_workers=n_chunks) as executor:
+        results = executor.map(_forecast_matrix, chunks, [time_index] * n_chunks, [future_index] * n_chunks,
+                               [time_interval] * n_chunks, [model_name] * n_chunks, [params] * n_chunks)
+        forecasts = np.vstack(list(results))
+
+    return future_index, forecasts
+
+
+def forecasts_to_long(port_names: List[str], future_index: pd.DatetimeIndex, forecasts: np.ndarray) -> pd.DataFrame:
+    """
+    Convert a (port x horizon) forecast matrix to the long format used by count_unique_vessels_by_time.
+
+    Args:
+        port_names (List[str]): The port name of every forecast row.
+        future_index (pandas.DatetimeIndex): The forecast time index.
+        forecasts (numpy.ndarray): The (port x horizon) forecasts.
+
+    Returns:
+        pandas.DataFrame: One row per port and time step with 'PortName', 'BaseDateTime' and 'UniqueVessels' columns.
+    """
+    return pd.DataFrame({
+        'PortName': np.repeat(port_names, len(future_index)),
+        'BaseDateTime': np.tile(future_index, len(port_names)),
+        'UniqueVessels': forecasts.ravel(),
+    })
+
+
+def forecast_port_demand(port_series: Dict[str, pd.DataFrame], horizon: int, time_interval: str = 'h',
+                         model_name: str = 'seasonal_baseline', n_jobs: int = 1, **params: float) -> pd.DataFrame:
+    """
+    Forecast hourly or daily unique vessel counts for many ports at once.
+
+    Args:
+        port_series (Dict[str, pandas.DataFrame]): Mapping of port name to the output of count_unique_vessels_by_time.
+        horizon (int): The number of time steps to forecast (e.g. 24 for next day or 168 for next week hourly).
+        time_interval (str, optional): The time interval of the series. Defaults to 'h' but can use 'd'.
+        model_name (str, optional): 'seasonal_baseline' or 'holt_winters'. Defaults to 'seasonal_baseline'.
+        n_jobs (int, optional): The number of worker processes. Defaults to 1.
+        **params (float): Smoothing parameters passed to the model's fit function.
+
+    Returns:
+        pandas.DataFrame: The forecasts with 'PortName', 'BaseDateTime' and 'UniqueVessels' columns.
+    """
+    port_names, time_index, matrix = stack_port_series(port_series, time_interval)
+    future_index, forecasts = forecast_matrix(matrix, time_index, horizon, time_interval, model_name, n_jobs, **params)
+
+    return forecasts_to_long(port_names, future_index, forecasts)
+
+
+def backtest_forecasts(port_series: Dict[str, pd.DataFrame], horizon: int, time_interval: str = 'h',
+                       model_name: str = 'seasonal_baseline', n_jobs: int = 1, **params: float) -> Dict[str, Union[int, float]]:
+    """
+    Hold out the last horizon time steps of every port, forecast them and report accuracy and runtime.
+
+    Args:
+        port_series (Dict[str, pandas.DataFrame]): Mapping of port name to the output of count_unique_vessels_by_time.
+        horizon (int): The number of held out time steps.
+        time_interval (str, optional): The time interval of the series. Defaults to 'h' but can use 'd'.
+        model_name (str, optional): 'seasonal_baseline' or 'holt_winters'. Defaults to 'seasonal_baseline'.
+        n_jobs (int, optional): The number of worker processes. Defaults to 1.
+        **params (float): Smoothing parameters passed to the model's fit function.
+
+    Returns:
+        Dict[str, Union[int, float]]: The number of 'ports', the 'mae' and 'rmse' over all held out
+            observations and the 'fit_seconds' spent fitting and forecasting.
+
+    Raises:
+        ValueError: If the series are not longer than the horizon.
+    """
+    port_names, time_index, matrix = stack_port_series(port_series, time_interval)
+    if matrix.shape[1] <= horizon:
+        raise ValueError(f"Series of {matrix.shape[1]} steps are too short to hold out {horizon} steps")
+
+    train, actual = matrix[:, :-horizon], matrix[:, -horizon:]
+
+    start = time.perf_counter()
+    _, forecasts = forecast_matrix(train, time_index[:-horizon], horizon, time_interval, model_name, n_jobs, **params)
+    fit_seconds = time.perf_counter() - start
+
+    errors = forecasts - actual
+
+    return {
+        'ports': len(port_names),
+        'mae': float(np.nanmean(np.abs(errors))),
+        'rmse': float(np.sqrt(np.nanmean(errors ** 2))),
+        'fit_seconds': fit_seconds,
+    }
@@ -1,3 +1,4 @@
+from typing import Dict, Optional
 import psycopg2
 import pandas as pd
 from db.connection import get_connection
@@ -5,7 +6,10 @@ from scripts.query_port_coordinates import get_long_beach_port
 
 
 #this code snippet retrieves AIS data for cargo vessels within a bounding box around a specified port from a database.
-def get_cargo_vessels_within_bounding_box(main_port_name:str,port_code: str, width: float, height: float, cargo_vessel_types: list) -> pd.DataFrame:
+def get_cargo_vessels_within_bounding_box(main_port_name:str,port_code: str, width: float, height: float, cargo_vessel_types: list,
+                                          start_time: Optional[str] = None, end_time: Optional[str] = None,
+                                          connection: Optional[psycopg2.extensions.connection] = None,
+                                          port_info: Optional[Dict[str, str]] = None) -> pd.DataFrame:
     """
     Retrieve AIS data for cargo vessels within a bounding box around a specified port.
 
@@ -14,6 +18,12 @@ def get_cargo_vessels_within_bounding_box(main_port_name:str,port_code: str, wid
         width (float): The width of the bounding box in nautical miles.
         height (float): The height of the bounding box in nautical miles.
         cargo_vessel_types (list): A list of cargo vessel types to filter the data for.
+        start_time (str, optional): Only keep positions at or after this time. Defaults to None.
+        end_time (str, optional): Only keep positions before this time. Defaults to None.
+        connection (psycopg2.extensions.connection, optional): An open connection to reuse, e.g. from the
+            connection pool. It is left open. Defaults to None, which opens and closes a new connection.
+        port_info (Dict[str, str], optional): The port already returned by get_long_beach_port, to skip
+            looking it up again. Defaults to None.
 
     Returns:
         pandas.DataFrame: The AIS data for cargo vessels within the bounding box.
@@ -22,8 +32,9 @@ def get_cargo_vessels_within_bounding_box(main_port_name:str,port_code: str, wid
         ValueError: If the port coordinates cannot be retrieved.
     """
 
-    # Get port coordinates from query_port_coordinates.py
-    port_info = get_long_beach_port(main_port_name=main_port_name)
+    # Get port coordinates from query_port_coordinates.py unless the caller already has them
+    if port_info is None:
+        port_info = get_long_beach_port(main_port_name=main_port_name, connection=connection)
     
     if not port_info:
         raise ValueError(f"Failed to retrieve coordinates for port code: {port_code}")
@@ -46,16 +57,27 @@ def get_cargo_vessels_within_bounding_box(main_port_name:str,port_code: str, wid
           AND "LON" BETWEEN %s AND %s
           AND "VesselType" IN %s
     """
-
-    # Connect to the database
-    connection = get_connection()
+    params = [lat_min, lat_max, lon_min, lon_max, tuple(cargo_vessel_types)]
+
+    # Optionally restrict the time range
+    if start_time is not None:
+        query += ' AND "BaseDateTime" >= %s'
+        params.append(start_time)
+    if end_time is not None:
+        query += ' AND "BaseDateTime" < %s'
+        params.append(end_time)
+
+    # Connect to the database unless the caller lends a connection
+    owns_connection = connection is None
+    if owns_connection:
+        connection = get_connection()
     if connection is None:
         return pd.DataFrame()  # Return an empty DataFrame on failure
 
     cursor = connection.cursor()
 
     # Execute the query with parameters
-    cursor.execute(query, (lat_min, lat_max, lon_min, lon_max, tuple(cargo_vessel_types)))
+    cursor.execute(query, tuple(params))
 
     # Fetch all matching rows
     results = cursor.fetchall()
@@ -66,13 +88,17 @@ def get_cargo_vessels_within_bounding_box(main_port_name:str,port_code: str, wid
     # Create a DataFrame from the results
     df = pd.DataFrame(results, columns=column_names)
 
-    # Close the cursor and connection
+    # Close the cursor and the connection if it was opened here
     cursor.close()
-    connection.close()
+    if owns_connection:
+        connection.close()
 
     return df
 
-def count_unique_vessels_by_time(main_port_name:str,port_code: str, width: float, height: float, cargo_vessel_types: list, time_interval: str = 'h') -> pd.DataFrame:
+def count_unique_vessels_by_time(main_port_name:str,port_code: str, width: float, height: float, cargo_vessel_types: list, time_interval: str = 'h',
+                                 start_time: Optional[str] = None, end_time: Optional[str] = None,
+                                 connection: Optional[psycopg2.extensions.connection] = None,
+                                 port_info: Optional[Dict[str, str]] = None) -> pd.DataFrame:
     """
     Count unique vessels in a given time interval within a bounding box around a specified port.
 
@@ -82,12 +108,18 @@ def count_unique_vessels_by_time(main_port_name:str,port_code: str, width: float
         height (float): The height of the bounding box in nautical miles.
         cargo_vessel_types (list): A list of cargo vessel types to filter the data for.
         time_interval (str, optional): The time interval to resample the data by. Defaults to 'h' but can use daily or weekly .
+        start_time (str, optional): Only count positions at or after this time. Defaults to None.
+        end_time (str, optional): Only count positions before this time. Defaults to None.
+        connection (psycopg2.extensions.connection, optional): An open connection to reuse. Defaults to None.
+        port_info (Dict[str, str], optional): The port already returned by get_long_beach_port. Defaults to None.
 
     Returns:
         pandas.DataFrame: The count of unique vessels in the given time interval.
     """
     # Get the filtered DataFrame using the bounding box
-    df = get_cargo_vessels_within_bounding_box(main_port_name,port_code, width, height, cargo_vessel_types)
+    df = get_cargo_vessels_within_bounding_box(main_port_name,port_code, width, height, cargo_vessel_types,
+                                               start_time=start_time, end_time=end_time, connection=connection,
+                                               port_info=port_info)
     print("Total vessels obtained after bounding box filter",len(df))
     
     if df.empty:
@@ -0,0 +1,381 @@
+import argparse
+import json
+import math
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import psycopg2
+import psycopg2.extensions
+
+from db.connection import close_connection_pool, get_connection_pool, pooled_connection
+from scripts.demand_identification import count_unique_vessels_by_time
+from scripts.query_port_coordinates import get_long_beach_port
+from scripts.response_cache import ResponseCache
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow responses are optional
+    pa = None
+
+JSON_CONTENT_TYPE = 'application/json'
+ARROW_CONTENT_TYPE = 'application/vnd.apache.arrow.stream'
+
+# Defaults match inference.py
+DEFAULT_VESSEL_TYPES: Tuple[str, ...] = ('70', '71', '72', '73', '74', '79')
+TIME_INTERVALS: Tuple[str, ...] = ('h', 'd', 'W')
+RESPONSE_FORMATS: Tuple[str, ...] = ('json', 'arrow')
+
+
+class RequestError(Exception):
+    """
+    An error caused by the request, returned to the client with the given HTTP status.
+    """
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def get_ais_data_version() -> Optional[int]:
+    """
+    Returns a counter that changes whenever rows are inserted, updated or deleted in ais_data,
+    including bulk loads with COPY. Used to invalidate cached responses after new AIS data is ingested.
+
+    Returns:
+        Optional[int]: The number of modified rows reported by the statistics collector,
+            or None if it could not be read.
+    """
+    query = """
+        SELECT n_tup_ins + n_tup_upd + n_tup_del
+        FROM pg_stat_user_tables
+        WHERE relname = 'ais_data';
+    """
+    try:
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query)
+            row = cursor.fetchone()
+            cursor.close()
+    except psycopg2.Error as e:
+        print("Error reading the AIS data version:", e)
+        return None
+
+    return None if row is None else int(row[0])
+
+
+def serialize_dataframe(df: pd.DataFrame, response_format: str) -> Tuple[str, bytes]:
+    """
+    Serializes a DataFrame as a JSON list of records or an Arrow IPC stream.
+
+    Args:
+        df (pandas.DataFrame): The DataFrame to serialize.
+        response_format (str): 'json' or 'arrow'.
+
+    Returns:
+        Tuple[str, bytes]: The content type and the response body.
+
+    Raises:
+        RequestError: If the format is unknown or Arrow is requested without pyarrow installed.
+    """
+    if response_format == 'json':
+        return JSON_CONTENT_TYPE, df.to_json(orient='records', date_format='iso').encode()
+
+    if response_format == 'arrow':
+        if pa is None:
+            raise RequestError(406, "Arrow responses require pyarrow to be installed")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return ARROW_CONTENT_TYPE, sink.getvalue().to_pybytes()
+
+    raise RequestError(400, f"Unknown format: {response_format}")
+
+
+@contextmanager
+def _database_connection() -> Iterator[psycopg2.extensions.connection]:
+    """
+    Borrows a pooled connection, reporting database failures as 503 rather than as request errors.
+
+    Raises:
+        RequestError: If no connection can be opened or a query fails.
+    """
+    try:
+        with pooled_connection() as connection:
+            yield connection
+    except psycopg2.Error as error:
+        raise RequestError(503, f"Database unavailable: {error}")
+
+
+def _lookup_port(connection: psycopg2.extensions.connection, port_name: str) -> Dict[str, str]:
+    """
+    Looks up a port on a borrowed connection.
+
+    get_long_beach_port returns None both when the port does not exist and when the query fails,
+    so a failed query is recognised from the state it leaves the connection in.
+
+    Raises:
+        RequestError: 503 if the query failed, 404 if the port does not exist.
+    """
+    port_info = get_long_beach_port(main_port_name=port_name, connection=connection)
+    if port_info is not None:
+        return port_info
+
+    failed_states = (psycopg2.extensions.TRANSACTION_STATUS_INERROR, psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN)
+    if connection.closed or connection.get_transaction_status() in failed_states:
+        raise RequestError(503, f"Database unavailable while looking up port: {port_name}")
+    raise RequestError(404, f"Port not found: {port_name}")
+
+
+def _single_param(params: Dict[str, List[str]], name: str, default: Optional[str] = None) -> Optional[str]:
+    """
+    Returns the last value of a query string parameter, or the default if it is missing.
+    """
+    values = params.get(name)
+    return values[-1] if values else default
+
+
+def _positive_float_param(params: Dict[str, List[str]], name: str, default: float) -> float:
+    """
+    Parses a positive, finite float query string parameter. NaN is rejected as well because it
+    never equals itself and would give every request its own cache entry.
+
+    Raises:
+        RequestError: If the value is not a finite number greater than 0.
+    """
+    value = _single_param(params, name)
+    if value is None:
+        return default
+    try:
+        number = float(value)
+    except ValueError:
+        raise RequestError(400, f"Parameter {name} must be a number, got {value!r}")
+    if not math.isfinite(number) or number <= 0:
+        raise RequestError(400, f"Parameter {name} must be a finite number greater than 0, got {value!r}")
+    return number
+
+
+def _time_param(params: Dict[str, List[str]], name: str) -> Optional[pd.Timestamp]:
+    """
+    Parses an optional timestamp query string parameter. Values with a time zone are converted
+    to naive UTC, because ais_data."BaseDateTime" is a TIMESTAMP without time zone and Postgres
+    would otherwise silently drop the offset.
+
+    Raises:
+        RequestError: If the value is not a timestamp.
+    """
+    value = _single_param(params, name)
+    if value is None:
+        return None
+    try:
+        timestamp = pd.Timestamp(value)
+    except ValueError:
+        raise RequestError(400, f"Parameter {name} must be a timestamp, got {value!r}")
+    if pd.isna(timestamp):
+        raise RequestError(400, f"Parameter {name} must be a timestamp, got {value!r}")
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+    return timestamp
+
+
+def _format_param(params: Dict[str, List[str]]) -> str:
+    """
+    Parses the response format query string parameter, defaulting to 'json'.
+
+    Raises:
+        RequestError: If the format is unknown or Arrow is requested without pyarrow installed.
+    """
+    response_format = _single_param(params, 'format', 'json')
+    if response_format not in RESPONSE_FORMATS:
+        raise RequestError(400, f"Parameter format must be one of {', '.join(RESPONSE_FORMATS)}")
+    if response_format == 'arrow' and pa is None:
+        raise RequestError(406, "Arrow responses require pyarrow to be installed")
+    return response_format
+
+
+def port_lookup(params: Dict[str, List[str]]) -> Tuple[Tuple[Any, ...], Callable[[], Tuple[str, bytes]]]:
+    """
+    Builds the cache key and the computation for a /port request.
+
+    Query parameters: name (required) and format ('json' or 'arrow', defaults to 'json').
+
+    Returns:
+        Tuple[Tuple[Any, ...], Callable[[], Tuple[str, bytes]]]: The cache key and a function producing the response.
+    """
+    port_name = _single_param(params, 'name')
+    if not port_name:
+        raise RequestError(400, "Parameter name is required")
+    response_format = _format_param(params)
+
+    def compute() -> Tuple[str, bytes]:
+        with _database_connection() as connection:
+            port_info = _lookup_port(connection, port_name)  # type: ignore
+        if response_format == 'json':
+            return JSON_CONTENT_TYPE, json.dumps(port_info).encode()
+        return serialize_dataframe(pd.DataFrame([port_info]), response_format)
+
+    return ('port', port_name, response_format), compute
+
+
+def unique_vessels_lookup(params: Dict[str, List[str]]) -> Tuple[Tuple[Any, ...], Callable[[], Tuple[str, bytes]]]:
+    """
+    Builds the cache key and the computation for a /unique_vessels request.
+
+    Query parameters: port (required), port_code, width and height (defaults 0.5), vessel_types
+    (comma separated, defaults to the cargo types of inference.py), interval ('h', 'd' or 'W',
+    defaults to 'h'), start and end (optional timestamps, start before end, converted to UTC if they have a time zone) and format ('json' or 'arrow').
+
+    Returns:
+        Tuple[Tuple[Any, ...], Callable[[], Tuple[str, bytes]]]: The cache key and a function producing the response.
+    """
+    port_name = _single_param(params, 'port')
+    if not port_name:
+        raise RequestError(400, "Parameter port is required")
+    port_code = _single_param(params, 'port_code', '')
+    width = _positive_float_param(params, 'width', 0.5)
+    height = _positive_float_param(params, 'height', 0.5)
+    vessel_types_param = _single_param(params, 'vessel_types')
+    vessel_types = (tuple(sorted({t.strip() for t in vessel_types_param.split(',') if t.strip()}))
+                    if vessel_types_param else DEFAULT_VESSEL_TYPES)
+    if not vessel_types:
+        raise RequestError(400, "Parameter vessel_types must list at least one vessel type")
+    time_interval = _single_param(params, 'interval', 'h')
+    if time_interval not in TIME_INTERVALS:
+        raise RequestError(400, f"Parameter interval must be one of {', '.join(TIME_INTERVALS)}")
+    start = _time_param(params, 'start')
+    end = _time_param(params, 'end')
+    if start is not None and end is not None and start >= end:
+        raise RequestError(400, "Parameter start must be before end")
+    # Normalised so equivalent spellings of the same time share a cache entry
+    start_time = None if start is None else start.isoformat()
+    end_time = None if end is None else end.isoformat()
+    response_format = _format_param(params)
+
+    def compute() -> Tuple[str, bytes]:
+        with _database_connection() as connection:
+            # Looked up here, and passed on, so a missing port (404) is not confused with a database failure (503)
+            port_info = _lookup_port(connection, port_name)  # type: ignore
+            df = count_unique_vessels_by_time(port_name, port_code, width, height, vessel_types,  # type: ignore
+                                              time_interval=time_interval, start_time=start_time,  # type: ignore
+                                              end_time=end_time, connection=connection, port_info=port_info)
+        if df.empty:
+            # count_unique_vessels_by_time returns the raw ais_data frame when nothing matched
+            df = pd.DataFrame({'BaseDateTime': pd.Series(dtype='datetime64[ns]'),
+                               'UniqueVessels': pd.Series(dtype='int64')})
+        return serialize_dataframe(df, response_format)
+
+    key = ('unique_vessels', port_name, port_code, width, height, vessel_types, time_interval,
+           start_time, end_time, response_format)
+    return key, compute
+
+
+ROUTES: Dict[str, Callable[[Dict[str, List[str]]], Tuple[Tuple[Any, ...], Callable[[], Tuple[str, bytes]]]]] = {
+    '/port': port_lookup,
+    '/unique_vessels': unique_vessels_lookup,
+}
+
+
+class DemandServiceHandler(BaseHTTPRequestHandler):
+    """
+    Serves the port lookup and unique vessel count endpoints from the server's response cache.
+    """
+    server: "DemandServer"
+
+    def _send(self, status: int, content_type: str, body: bytes, cache_status: Optional[str] = None) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if cache_status is not None:
+            self.send_header('X-Cache', cache_status)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        self._send(status, JSON_CONTENT_TYPE, json.dumps(payload).encode())
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+
+        if url.path == '/health':
+            self._send_json(200, {'status': 'ok', 'cache': self.server.cache.stats()})
+            return
+
+        route = ROUTES.get(url.path)
+        if route is None:
+            self._send_json(404, {'error': f"Unknown endpoint: {url.path}"})
+            return
+
+        try:
+            key, compute = route(parse_qs(url.query))
+            (content_type, body), cache_status = self.server.cache.get_or_compute(key, compute)
+        except RequestError as error:
+            self._send_json(error.status, {'error': str(error)})
+            return
+        except Exception as error:
+            self._send_json(500, {'error': str(error)})
+            return
+
+        self._send(200, content_type, body, cache_status)
+
+    def do_POST(self) -> None:
+        # Called by ingestion jobs right after loading new AIS data
+        if urlparse(self.path).path == '/invalidate':
+            self.server.cache.invalidate()
+            self._send_json(200, {'status': 'invalidated'})
+        else:
+            self._send_json(404, {'error': f"Unknown endpoint: {self.path}"})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class DemandServer(ThreadingHTTPServer):
+    """
+    A threaded HTTP server holding the shared response cache.
+    """
+    daemon_threads = True
+    request_queue_size = 128  # The default of 5 drops connections under concurrent load
+
+    def __init__(self, address: Tuple[str, int], cache: ResponseCache, verbose: bool = False) -> None:
+        super().__init__(address, DemandServiceHandler)
+        self.cache = cache
+        self.verbose = verbose
+
+
+def main() -> None:
+    """
+    Starts the demand query service on a pooled database connection.
+
+    This function reads its options from the command line and does not return anything.
+    """
+    parser = argparse.ArgumentParser(description="Local port demand query service")
+    parser.add_argument('--host', default='127.0.0.1', help="Address to listen on")
+    parser.add_argument('--port', type=int, default=8000, help="Port to listen on")
+    parser.add_argument('--max-connections', type=int, default=10, help="Size of the database connection pool")
+    parser.add_argument('--cache-entries', type=int, default=256, help="Number of cached responses")
+    parser.add_argument('--version-check-interval', type=float, default=5.0,
+                        help="Seconds between checks for newly ingested AIS data")
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args()
+
+    get_connection_pool(max_connections=args.max_connections)
+    cache = ResponseCache(max_entries=args.cache_entries, version_source=get_ais_data_version,
+                          version_check_interval=args.version_check_interval)
+    server = DemandServer((args.host, args.port), cache, verbose=args.verbose)
+
+    print(f"Serving port demand on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        close_connection_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+DEFAULT_PATH = "/unique_vessels?port=Long%20Beach&port_code=USLGB&width=0.5&height=0.5&interval=h"
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """
+    Returns the nearest-rank percentile of an ascending list of values.
+
+    Args:
+        sorted_values (List[float]): The values in ascending order.
+        fraction (float): The percentile as a fraction, e.g. 0.99.
+
+    Returns:
+        float: The value at the requested percentile.
+    """
+    rank = max(int(round(fraction * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def timed_request(url: str, timeout: float) -> Tuple[float, str]:
+    """
+    Sends one GET request and measures its latency.
+
+    Args:
+        url (str): The URL to request.
+        timeout (float): Seconds before the request is abandoned.
+
+    Returns:
+        Tuple[float, str]: The latency in seconds and the X-Cache header, or the error status.
+    """
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+            status = response.headers.get('X-Cache', 'ok')
+    except urllib.error.HTTPError as error:
+        status = f"http {error.code}"
+    except OSError as error:
+        status = f"error {type(error).__name__}"
+    return time.perf_counter() - start, status
+
+
+def main() -> None:
+    """
+    Sends concurrent requests to the demand query service and reports p50/p99 latency and requests/sec.
+
+    This function reads its options from the command line and does not return anything.
+    """
+    parser = argparse.ArgumentParser(description="Load test the local port demand query service")
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000', help="Address of the running service")
+    parser.add_argument('--path', action='append', help="Request path, may be repeated to mix queries")
+    parser.add_argument('--requests', type=int, default=1000, help="Total number of requests")
+    parser.add_argument('--concurrency', type=int, default=16, help="Number of concurrent clients")
+    parser.add_argument('--timeout', type=float, default=60.0, help="Per request timeout in seconds")
+    parser.add_argument('--cold', action='store_true', help="Invalidate the response cache before starting")
+    args = parser.parse_args()
+
+    paths = args.path or [DEFAULT_PATH]
+    urls = [args.base_url + paths[i % len(paths)] for i in range(args.requests)]
+
+    if args.cold:
+        urllib.request.urlopen(urllib.request.Request(args.base_url + '/invalidate', method='POST'), timeout=args.timeout).read()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(lambda url: timed_request(url, args.timeout), urls))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    statuses = Counter(status for _, status in results)
+
+    print(f"Requests: {args.requests}  Concurrency: {args.concurrency}  Paths: {len(paths)}")
+    print(f"p50: {percentile(latencies, 0.50) * 1000:.2f} ms  p99: {percentile(latencies, 0.99) * 1000:.2f} ms")
+    print(f"Throughput: {args.requests / elapsed:.1f} requests/sec over {elapsed:.2f}s")
+    print("Responses:", ", ".join(f"{status}={count}" for status, count in sorted(statuses.items())))
+
+
+if __name__ == "__main__":
+    main()
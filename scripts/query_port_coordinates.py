@@ -1,22 +1,26 @@
-from typing import Dict, Union
+from typing import Dict, Optional, Union
 import psycopg2
 from db.connection import get_connection
 
 
 
-def get_long_beach_port(main_port_name: str) -> Union[Dict[str, str], None]:
+def get_long_beach_port(main_port_name: str, connection: Optional[psycopg2.extensions.connection] = None) -> Union[Dict[str, str], None]:
     """
     Retrieves the coordinates of the specified main port from the port_coordinates table in the database.
 
     Args:
         main_port_name (str): The name of the main port to retrieve coordinates for. Defaults to 'Long Beach'.
+        connection (psycopg2.extensions.connection, optional): An open connection to reuse, e.g. from the
+            connection pool. It is left open. Defaults to None, which opens and closes a new connection.
 
     Returns:
         Union[Dict[str, str], None]: A dictionary containing the coordinates of the main port if found, None otherwise.
     """
     try:
-        # Establish connection
-        connection = get_connection()
+        # Establish connection unless the caller lends one
+        owns_connection = connection is None
+        if owns_connection:
+            connection = get_connection()
         if connection is None:
             return None
 
@@ -36,9 +40,10 @@ def get_long_beach_port(main_port_name: str) -> Union[Dict[str, str], None]:
         column_names = [desc[0] for desc in cursor.description]
         row = cursor.fetchone()
 
-        # Close the cursor and connection
+        # Close the cursor and the connection if it was opened here
         cursor.close()
-        connection.close()
+        if owns_connection:
+            connection.close()
 
         # Check if a row is found
         if row is None:
@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _InFlight:
+    """
+    A computation currently running for one cache key, shared by every request waiting on it.
+    """
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ResponseCache:
+    """
+    A thread-safe keyed LRU cache that coalesces concurrent computations of the same key.
+
+    Entries are dropped when invalidate is called or when the value returned by version_source
+    changes, e.g. because new AIS data was ingested. Concurrent misses on the same key wait for
+    a single computation instead of each running it.
+
+    Args:
+        max_entries (int, optional): The number of entries kept before the least recently used is evicted. Defaults to 256.
+        version_source (Callable[[], Hashable], optional): Returns a token that changes whenever the
+            underlying data changes, or None if it is unknown right now. Defaults to None, which only
+            invalidates explicitly.
+        version_check_interval (float, optional): Seconds between calls to version_source. Defaults to 5.0.
+    """
+
+    def __init__(self, max_entries: int = 256, version_source: Optional[Callable[[], Hashable]] = None,
+                 version_check_interval: float = 5.0) -> None:
+        self.max_entries = max_entries
+        self.version_source = version_source
+        self.version_check_interval = version_check_interval
+
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._in_flight: Dict[Tuple[int, Hashable], _InFlight] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+        self._version: Optional[Hashable] = None
+        self._version_checked_at = float('-inf')
+        self._version_lock = threading.Lock()
+
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'invalidations': 0}
+
+    def invalidate(self) -> None:
+        """
+        Drops every cached entry. Computations already running are not stored when they finish.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._stats['invalidations'] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the hit, miss, coalesced and invalidation counters and the number of cached entries.
+        """
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
+
+    def _check_version(self) -> None:
+        """
+        Invalidates the cache if the data version changed since the last check.
+        Only one thread polls the version source at a time; the others carry on with the current entries.
+        """
+        if self.version_source is None:
+            return
+        if time.monotonic() - self._version_checked_at < self.version_check_interval:
+            return
+        if not self._version_lock.acquire(blocking=False):
+            return
+
+        try:
+            version = self.version_source()
+            self._version_checked_at = time.monotonic()
+            if version is None:
+                return  # Keep serving the current entries and retry on the next check
+            if self._version is not None and version != self._version:
+                self.invalidate()
+            self._version = version
+        finally:
+            self._version_lock.release()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Tuple[Any, str]:
+        """
+        Returns the cached value for key, computing it at most once across concurrent callers.
+
+        Args:
+            key (Hashable): The cache key.
+            compute (Callable[[], Any]): Produces the value on a miss.
+
+        Returns:
+            Tuple[Any, str]: The value and how it was obtained: 'hit', 'miss' or 'coalesced'.
+
+        Raises:
+            Exception: Whatever compute raised. Failed computations are not cached.
+        """
+        self._check_version()
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return self._entries[key], 'hit'
+
+            flight_key = (self._generation, key)
+            waiting_on = self._in_flight.get(flight_key)
+            if waiting_on is None:
+                flight = self._in_flight[flight_key] = _InFlight()
+                self._stats['misses'] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        if waiting_on is not None:
+            waiting_on.done.wait()
+            if waiting_on.error is not None:
+                raise waiting_on.error
+            return waiting_on.value, 'coalesced'
+
+        try:
+            flight.value = compute()
+        except BaseException as error:
+            flight.error = error
+            raise
+        else:
+            with self._lock:
+                # Skip storing results computed against data that was invalidated meanwhile
+                if flight_key[0] == self._generation:
+                    self._entries[key] = flight.value
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            return flight.value, 'miss'
+        finally:
+            with self._lock:
+                del self._in_flight[flight_key]
+            flight.done.set()
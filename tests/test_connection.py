@@ -0,0 +1,51 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from db.connection import close_connection_pool, get_connection_pool, pooled_connection
+
+
+class TestConnectionPool(unittest.TestCase):
+    def tearDown(self) -> None:
+        close_connection_pool()
+
+    @patch('psycopg2.connect')
+    def test_pooled_connection_is_returned(self, mock_connect: MagicMock) -> None:
+        """
+        Test that a borrowed connection goes back to the pool and is reused by the next borrower.
+
+        Args:
+            mock_connect (MagicMock): Mock of psycopg2.connect used by the pool.
+
+        Returns:
+            None: This function does not return anything.
+        """
+        with pooled_connection() as first:
+            pass
+        with pooled_connection() as second:
+            pass
+
+        self.assertIs(first, second)
+        first.close.assert_not_called()
+
+    @patch('psycopg2.connect')
+    def test_pool_closed_while_borrowed(self, mock_connect: MagicMock) -> None:
+        """
+        Test that closing the pool while a connection is borrowed does not fail when the borrower finishes.
+
+        Args:
+            mock_connect (MagicMock): Mock of psycopg2.connect used by the pool.
+
+        Returns:
+            None: This function does not return anything.
+        """
+        with pooled_connection() as connection:
+            close_connection_pool()
+
+        connection.close.assert_called()
+
+        # The next borrower gets a fresh pool
+        pool, _ = get_connection_pool()
+        self.assertFalse(pool.closed)
+
+if __name__ == '__main__':
+    unittest.main()
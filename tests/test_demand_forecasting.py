@@ -0,0 +1,89 @@
+from typing import Dict
+import unittest
+import numpy as np
+import pandas as pd
+
+from scripts.demand_forecasting import backtest_forecasts, forecast_port_demand, stack_port_series
+
+
+def make_port_series() -> Dict[str, pd.DataFrame]:
+    """
+    Build two weeks of hourly vessel counts for two ports with a repeating daily pattern.
+
+    Returns:
+        Dict[str, pandas.DataFrame]: Mapping of port name to a count_unique_vessels_by_time style DataFrame.
+    """
+    time_index = pd.date_range('2020-01-01', periods=14 * 24, freq='h')
+    daily_pattern = np.where(time_index.hour < 12, 10, 20)
+    return {
+        'Long Beach': pd.DataFrame({'BaseDateTime': time_index, 'UniqueVessels': daily_pattern}),
+        'Los Angeles': pd.DataFrame({'BaseDateTime': time_index, 'UniqueVessels': daily_pattern + 5}),
+    }
+
+
+class TestDemandForecasting(unittest.TestCase):
+    def test_stack_port_series(self) -> None:
+        """
+        Test that stack_port_series aligns ports of different lengths on one time axis.
+
+        Returns:
+            None: This function does not return anything.
+        """
+        port_series = make_port_series()
+        port_series['Los Angeles'] = port_series['Los Angeles'].iloc[24:]
+
+        port_names, time_index, matrix = stack_port_series(port_series, time_interval='h')
+
+        self.assertEqual(port_names, ['Long Beach', 'Los Angeles'])
+        self.assertEqual(matrix.shape, (2, len(time_index)))
+        self.assertTrue(np.isnan(matrix[1, :24]).all())  # Missing hours are NaN
+        self.assertFalse(np.isnan(matrix[0]).any())
+
+    def test_forecast_port_demand_long_format(self) -> None:
+        """
+        Test that forecast_port_demand returns the historical long format and recovers the daily pattern.
+
+        Returns:
+            None: This function does not return anything.
+        """
+        for model_name in ('seasonal_baseline', 'holt_winters'):
+            forecast_df: pd.DataFrame = forecast_port_demand(make_port_series(), horizon=24, model_name=model_name)
+
+            self.assertEqual(list(forecast_df.columns), ['PortName', 'BaseDateTime', 'UniqueVessels'])
+            self.assertEqual(len(forecast_df), 2 * 24)
+            self.assertEqual(forecast_df['BaseDateTime'].min(), pd.Timestamp('2020-01-15 00:00:00'))
+
+            long_beach = forecast_df[forecast_df['PortName'] == 'Long Beach']
+            np.testing.assert_allclose(long_beach['UniqueVessels'].iloc[:12], 10, atol=0.5)
+            np.testing.assert_allclose(long_beach['UniqueVessels'].iloc[12:], 20, atol=0.5)
+
+    def test_forecast_port_demand_process_pool(self) -> None:
+        """
+        Test that fanning ports out to worker processes gives the same forecasts as a single process.
+
+        Returns:
+            None: This function does not return anything.
+        """
+        single = forecast_port_demand(make_port_series(), horizon=24, n_jobs=1)
+        pooled = forecast_port_demand(make_port_series(), horizon=24, n_jobs=2)
+
+        pd.testing.assert_frame_equal(single, pooled)
+
+    def test_backtest_forecasts(self) -> None:
+        """
+        Test that backtest_forecasts reports accuracy and runtime and rejects too long horizons.
+
+        Returns:
+            None: This function does not return anything.
+        """
+        result = backtest_forecasts(make_port_series(), horizon=24)
+
+        self.assertEqual(result['ports'], 2)
+        self.assertLess(result['mae'], 0.5)
+        self.assertGreaterEqual(result['fit_seconds'], 0.0)
+
+        with self.assertRaises(ValueError):
+            backtest_forecasts(make_port_series(), horizon=14 * 24)
+
+if __name__ == '__main__':
+    unittest.main()
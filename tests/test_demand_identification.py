@@ -1,8 +1,10 @@
 from typing import List
 import unittest
+from unittest.mock import patch, MagicMock
 import pandas as pd
 
 from scripts.demand_identification import get_cargo_vessels_within_bounding_box, count_unique_vessels_by_time
+from scripts.query_port_coordinates import get_long_beach_port
 
 class TestDemandIdentification(unittest.TestCase):
     def test_get_cargo_vessels_within_bounding_box(self) -> None:
@@ -64,5 +66,141 @@ class TestDemandIdentification(unittest.TestCase):
         # Assert that the returned object is a pandas DataFrame
         self.assertIsInstance(df, pd.DataFrame)
 
+
+class TestBorrowedConnection(unittest.TestCase):
+    def make_connection(self) -> MagicMock:
+        """
+        Build a mock connection whose cursor first returns the Long Beach port row and then one AIS row.
+
+        Returns:
+            MagicMock: The mock connection.
+        """
+        mock_connection: MagicMock = MagicMock()  # Mock database connection
+        mock_cursor: MagicMock = MagicMock()  # Mock cursor object
+        mock_connection.cursor.return_value = mock_cursor
+
+        # Port lookup result
+        mock_cursor.fetchone.return_value = ('Long Beach', 'USLGB', 33.75, -118.2)
+        # AIS query result
+        mock_cursor.fetchall.return_value = [(367000001, '2020-01-01 00:05:00', 70)]
+
+        # The port lookup reads the description before the AIS query does
+        port_description = [(col,) for col in ['Main Port Name', 'UN/LOCODE', 'Latitude', 'Longitude']]
+        ais_description = [(col,) for col in ['MMSI', 'BaseDateTime', 'VesselType']]
+        type(mock_cursor).description = property(MagicMock(side_effect=[port_description, ais_description]))
+        return mock_connection
+
+    @patch('scripts.demand_identification.get_connection')
+    @patch('scripts.query_port_coordinates.get_connection')
+    def test_time_range_filter_and_borrowed_connection(self, mock_port_connection: MagicMock,
+                                                      mock_ais_connection: MagicMock) -> None:
+        """
+        Test that start_time and end_time add "BaseDateTime" clauses and that a borrowed
+        connection is used for both queries and never closed.
+
+        Args:
+            mock_port_connection (MagicMock): Mock of get_connection in query_port_coordinates.
+            mock_ais_connection (MagicMock): Mock of get_connection in demand_identification.
+
+        Returns:
+            None: This function does not return anything.
+        """
+        mock_connection = self.make_connection()
+        mock_cursor: MagicMock = mock_connection.cursor.return_value
+
+        df: pd.DataFrame = get_cargo_vessels_within_bounding_box(
+            'Long Beach', 'USLGB', 0.5, 0.5, ['70', '71'],
+            start_time='2020-01-01T00:00:00', end_time='2020-01-02T00:00:00', connection=mock_connection)
+
+        self.assertEqual(list(df['MMSI']), [367000001])
+
+        # Verify the AIS query has both time clauses with the time range as the last parameters
+        query, params = mock_cursor.execute.call_args_list[-1][0]
+        self.assertIn('AND "BaseDateTime" >= %s', query)
+        self.assertIn('AND "BaseDateTime" < %s', query)
+        self.assertEqual(params[-3:], (('70', '71'), '2020-01-01T00:00:00', '2020-01-02T00:00:00'))
+
+        # The borrowed connection serves both queries and is left open
+        mock_port_connection.assert_not_called()
+        mock_ais_connection.assert_not_called()
+        mock_connection.close.assert_not_called()
+
+    @patch('scripts.demand_identification.get_connection')
+    @patch('scripts.query_port_coordinates.get_connection')
+    def test_no_time_range_and_own_connection(self, mock_port_connection: MagicMock,
+                                              mock_ais_connection: MagicMock) -> None:
+        """
+        Test that without a time range no "BaseDateTime" clause is added and that connections
+        opened by the functions themselves are closed.
+
+        Args:
+            mock_port_connection (MagicMock): Mock of get_connection in query_port_coordinates.
+            mock_ais_connection (MagicMock): Mock of get_connection in demand_identification.
+
+        Returns:
+            None: This function does not return anything.
+        """
+        mock_connection = self.make_connection()
+        mock_port_connection.return_value = mock_connection
+        mock_ais_connection.return_value = mock_connection
+        mock_cursor: MagicMock = mock_connection.cursor.return_value
+
+        get_cargo_vessels_within_bounding_box('Long Beach', 'USLGB', 0.5, 0.5, ['70'])
+
+        query, params = mock_cursor.execute.call_args_list[-1][0]
+        self.assertNotIn('BaseDateTime', query)
+        self.assertEqual(len(params), 5)
+        self.assertEqual(mock_connection.close.call_count, 2)  # Port lookup and AIS query
+
+    @patch('scripts.demand_identification.get_long_beach_port')
+    def test_port_info_skips_port_lookup(self, mock_get_long_beach_port: MagicMock) -> None:
+        """
+        Test that passing the port already looked up runs only the AIS query.
+
+        Args:
+            mock_get_long_beach_port (MagicMock): Mock of get_long_beach_port in demand_identification.
+
+        Returns:
+            None: This function does not return anything.
+        """
+        mock_connection: MagicMock = MagicMock()  # Mock database connection
+        mock_cursor: MagicMock = mock_connection.cursor.return_value
+        mock_cursor.fetchall.return_value = []
+        mock_cursor.description = [(col,) for col in ['MMSI', 'BaseDateTime', 'VesselType']]
+        port_info = {'Main Port Name': 'Long Beach', 'UN/LOCODE': 'USLGB', 'Latitude': 33.75, 'Longitude': -118.2}
+
+        get_cargo_vessels_within_bounding_box('Long Beach', 'USLGB', 0.5, 0.5, ['70'],
+                                              connection=mock_connection, port_info=port_info)  # type: ignore
+
+        mock_get_long_beach_port.assert_not_called()
+        self.assertEqual(mock_cursor.execute.call_count, 1)
+        params = mock_cursor.execute.call_args[0][1]
+        self.assertEqual(params[:4], (33.5, 34.0, -118.45, -117.95))
+
+    @patch('scripts.query_port_coordinates.get_connection')
+    def test_get_long_beach_port_borrowed_connection(self, mock_get_connection: MagicMock) -> None:
+        """
+        Test that get_long_beach_port leaves a borrowed connection open, whether or not the port is found.
+
+        Args:
+            mock_get_connection (MagicMock): Mock of get_connection in query_port_coordinates.
+
+        Returns:
+            None: This function does not return anything.
+        """
+        mock_connection = self.make_connection()
+        mock_cursor: MagicMock = mock_connection.cursor.return_value
+        type(mock_cursor).description = [(col,) for col in ['Main Port Name', 'UN/LOCODE', 'Latitude', 'Longitude']]
+
+        result = get_long_beach_port('Long Beach', connection=mock_connection)
+        self.assertEqual(result['UN/LOCODE'], 'USLGB')  # type: ignore
+
+        mock_cursor.fetchone.return_value = None
+        self.assertIsNone(get_long_beach_port('Atlantis', connection=mock_connection))
+
+        mock_get_connection.assert_not_called()
+        mock_connection.close.assert_not_called()
+        self.assertEqual(mock_cursor.close.call_count, 2)
+
 if __name__ == '__main__':
     unittest.main()
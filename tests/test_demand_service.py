@@ -0,0 +1,237 @@
+import json
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from typing import Dict, Iterator, Tuple
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import psycopg2
+import psycopg2.extensions
+
+from scripts import demand_service
+from scripts.demand_service import DemandServer
+from scripts.response_cache import ResponseCache
+
+PORT_INFO: Dict[str, object] = {'Main Port Name': 'Long Beach', 'UN/LOCODE': 'USLGB', 'Latitude': 33.75, 'Longitude': -118.2}
+
+
+def make_unique_vessels() -> pd.DataFrame:
+    """
+    Build a small count_unique_vessels_by_time style result.
+
+    Returns:
+        pandas.DataFrame: Three hours of unique vessel counts.
+    """
+    return pd.DataFrame({'BaseDateTime': pd.date_range('2020-01-01', periods=3, freq='h'), 'UniqueVessels': [18, 17, 16]})
+
+
+class TestDemandService(unittest.TestCase):
+    server: DemandServer
+    base_url: str
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Start the service on a free local port with a shared response cache.
+        """
+        cls.server = DemandServer(('127.0.0.1', 0), ResponseCache())
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        """
+        Patch the database access of the service and start every test with an empty cache.
+        """
+        self.server.cache.invalidate()
+
+        self.mock_connection: MagicMock = MagicMock()  # Mock pooled connection
+        self.mock_connection.closed = 0
+        self.mock_connection.get_transaction_status.return_value = psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+
+        @contextmanager
+        def fake_pooled_connection() -> Iterator[MagicMock]:
+            yield self.mock_connection
+
+        for patcher in (patch.object(demand_service, 'pooled_connection', fake_pooled_connection),
+                        patch.object(demand_service, 'get_long_beach_port', return_value=PORT_INFO),
+                        patch.object(demand_service, 'count_unique_vessels_by_time', return_value=make_unique_vessels())):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.mock_get_port: MagicMock = demand_service.get_long_beach_port  # type: ignore
+        self.mock_count: MagicMock = demand_service.count_unique_vessels_by_time  # type: ignore
+
+    def request(self, path: str) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Send a GET request to the service.
+
+        Args:
+            path (str): The request path including the query string.
+
+        Returns:
+            Tuple[int, Dict[str, str], bytes]: The status code, the response headers and the body.
+        """
+        try:
+            with urllib.request.urlopen(self.base_url + path) as response:
+                return response.status, dict(response.headers), response.read()
+        except urllib.error.HTTPError as error:
+            return error.code, dict(error.headers), error.read()
+
+    def test_unique_vessels_json_and_cache_header(self) -> None:
+        """
+        Test that /unique_vessels returns JSON records and that a repeated request is served from the cache.
+        """
+        status, headers, body = self.request('/unique_vessels?port=Long%20Beach')
+
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['Content-Type'], 'application/json')
+        self.assertEqual(headers['X-Cache'], 'miss')
+        records = json.loads(body)
+        self.assertEqual([record['UniqueVessels'] for record in records], [18, 17, 16])
+
+        status, headers, _ = self.request('/unique_vessels?port=Long%20Beach')
+        self.assertEqual(headers['X-Cache'], 'hit')
+        self.assertEqual(self.mock_count.call_count, 1)
+
+        # The port is looked up once and handed on instead of being queried again
+        self.mock_get_port.assert_called_once_with(main_port_name='Long Beach', connection=self.mock_connection)
+        self.assertEqual(self.mock_count.call_args[1]['port_info'], PORT_INFO)
+
+    @unittest.skipIf(demand_service.pa is None, "pyarrow is not installed")
+    def test_unique_vessels_arrow(self) -> None:
+        """
+        Test that format=arrow returns an Arrow IPC stream with the same rows.
+        """
+        status, headers, body = self.request('/unique_vessels?port=Long%20Beach&format=arrow')
+
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['Content-Type'], 'application/vnd.apache.arrow.stream')
+        table = demand_service.pa.ipc.open_stream(body).read_all()
+        self.assertEqual(table.column('UniqueVessels').to_pylist(), [18, 17, 16])
+
+    @unittest.skipIf(demand_service.pa is None, "pyarrow is not installed")
+    def test_empty_result_keeps_schema(self) -> None:
+        """
+        Test that a port without AIS rows returns the BaseDateTime/UniqueVessels schema, not the ais_data columns.
+        """
+        self.mock_count.return_value = pd.DataFrame(columns=['MMSI', 'BaseDateTime', 'LAT', 'LON', 'VesselType'])
+
+        status, _, body = self.request('/unique_vessels?port=Long%20Beach')
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body), [])
+
+        status, _, body = self.request('/unique_vessels?port=Long%20Beach&format=arrow')
+        self.assertEqual(status, 200)
+        schema = demand_service.pa.ipc.open_stream(body).schema
+        self.assertEqual(schema.names, ['BaseDateTime', 'UniqueVessels'])
+        self.assertEqual(str(schema.field('UniqueVessels').type), 'int64')
+
+    def test_unique_vessels_parameters(self) -> None:
+        """
+        Test that vessel types are split and sorted and the time range is normalised before querying.
+        """
+        status, _, _ = self.request('/unique_vessels?port=Long%20Beach&port_code=USLGB&width=1&height=2'
+                                    '&vessel_types=%2071,70%20,70&interval=d&start=2020-01-01&end=2020-01-02T00:00')
+        self.assertEqual(status, 200)
+
+        args, kwargs = self.mock_count.call_args
+        self.assertEqual(args[:5], ('Long Beach', 'USLGB', 1.0, 2.0, ('70', '71')))
+        self.assertEqual(kwargs['time_interval'], 'd')
+        self.assertEqual(kwargs['start_time'], '2020-01-01T00:00:00')
+        self.assertEqual(kwargs['end_time'], '2020-01-02T00:00:00')
+
+        # The same range spelled differently shares the cache entry
+        _, headers, _ = self.request('/unique_vessels?port=Long%20Beach&port_code=USLGB&width=1.0&height=2'
+                                     '&vessel_types=70,71&interval=d&start=2020-01-01T00:00&end=2020-01-02')
+        self.assertEqual(headers['X-Cache'], 'hit')
+
+    def test_time_zone_converted_to_utc(self) -> None:
+        """
+        Test that start and end with a time zone are converted to naive UTC, matching the
+        TIMESTAMP without time zone column, and may be mixed with naive values.
+        """
+        status, _, _ = self.request('/unique_vessels?port=Long%20Beach'
+                                    '&start=2020-01-01T00:00:00%2B05:00&end=2020-01-01T12:00')
+        self.assertEqual(status, 200)
+
+        _, kwargs = self.mock_count.call_args
+        self.assertEqual(kwargs['start_time'], '2019-12-31T19:00:00')
+        self.assertEqual(kwargs['end_time'], '2020-01-01T12:00:00')
+
+        # The same instant in UTC shares the cache entry
+        _, headers, _ = self.request('/unique_vessels?port=Long%20Beach&start=2019-12-31T19:00Z&end=2020-01-01T12:00')
+        self.assertEqual(headers['X-Cache'], 'hit')
+
+    def test_invalid_parameters(self) -> None:
+        """
+        Test that invalid parameters are rejected with a 400 before the database is queried.
+        """
+        misses_before = self.server.cache.stats()['misses']
+        for path in ('/unique_vessels',
+                     '/unique_vessels?port=Long%20Beach&width=wide',
+                     '/unique_vessels?port=Long%20Beach&width=nan',
+                     '/unique_vessels?port=Long%20Beach&width=inf',
+                     '/unique_vessels?port=Long%20Beach&height=-0.5',
+                     '/unique_vessels?port=Long%20Beach&height=0',
+                     '/unique_vessels?port=Long%20Beach&interval=m',
+                     '/unique_vessels?port=Long%20Beach&vessel_types=,',
+                     '/unique_vessels?port=Long%20Beach&start=abc',
+                     '/unique_vessels?port=Long%20Beach&start=2020-01-02&end=2020-01-01',
+                     '/unique_vessels?port=Long%20Beach&format=xml',
+                     '/port',
+                     '/port?name=Long%20Beach&format=xml'):
+            status, _, body = self.request(path)
+            self.assertEqual(status, 400, path)
+            self.assertIn('error', json.loads(body))
+
+        self.mock_count.assert_not_called()
+        self.mock_get_port.assert_not_called()
+        self.assertEqual(self.server.cache.stats()['misses'], misses_before)
+
+    def test_port_lookup(self) -> None:
+        """
+        Test that /port returns the port coordinates as JSON.
+        """
+        status, _, body = self.request('/port?name=Long%20Beach')
+
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body), PORT_INFO)
+        self.mock_get_port.assert_called_once_with(main_port_name='Long Beach', connection=self.mock_connection)
+
+    def test_port_not_found_and_database_failure(self) -> None:
+        """
+        Test that a missing port is a 404 while a failed lookup query or pool error is a 503.
+        """
+        self.mock_get_port.return_value = None
+
+        status, _, _ = self.request('/port?name=Atlantis')
+        self.assertEqual(status, 404)
+        status, _, _ = self.request('/unique_vessels?port=Atlantis')
+        self.assertEqual(status, 404)
+
+        # get_long_beach_port swallows the error but leaves the transaction aborted
+        self.mock_connection.get_transaction_status.return_value = psycopg2.extensions.TRANSACTION_STATUS_INERROR
+        status, _, _ = self.request('/port?name=Long%20Beach')
+        self.assertEqual(status, 503)
+        status, _, _ = self.request('/unique_vessels?port=Long%20Beach')
+        self.assertEqual(status, 503)
+        self.mock_count.assert_not_called()
+
+        @contextmanager
+        def unavailable_pool() -> Iterator[MagicMock]:
+            raise psycopg2.OperationalError("connection refused")
+            yield  # pragma: no cover
+
+        with patch.object(demand_service, 'pooled_connection', unavailable_pool):
+            status, _, _ = self.request('/port?name=Long%20Beach')
+        self.assertEqual(status, 503)
+
+if __name__ == '__main__':
+    unittest.main()
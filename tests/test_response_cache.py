@@ -0,0 +1,109 @@
+import threading
+import time
+import unittest
+from typing import List
+
+from scripts.response_cache import ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_hit_after_miss(self) -> None:
+        """
+        Test that a second lookup of the same key is served from the cache.
+
+        Returns:
+            None: This function does not return anything.
+        """
+        cache = ResponseCache()
+        calls: List[int] = []
+
+        def compute() -> str:
+            calls.append(1)
+            return 'value'
+
+        self.assertEqual(cache.get_or_compute('key', compute), ('value', 'miss'))
+        self.assertEqual(cache.get_or_compute('key', compute), ('value', 'hit'))
+        self.assertEqual(len(calls), 1)
+
+    def test_least_recently_used_entry_is_evicted(self) -> None:
+        """
+        Test that the cache keeps at most max_entries entries, evicting the least recently used.
+
+        Returns:
+            None: This function does not return anything.
+        """
+        cache = ResponseCache(max_entries=2)
+        cache.get_or_compute('a', lambda: 1)
+        cache.get_or_compute('b', lambda: 2)
+        cache.get_or_compute('a', lambda: 1)  # 'b' is now the least recently used
+        cache.get_or_compute('c', lambda: 3)
+
+        self.assertEqual(cache.get_or_compute('a', lambda: 1)[1], 'hit')
+        self.assertEqual(cache.get_or_compute('b', lambda: 2)[1], 'miss')
+        self.assertEqual(cache.stats()['entries'], 2)
+
+    def test_version_change_invalidates(self) -> None:
+        """
+        Test that entries are dropped when the data version changes, e.g. after new AIS data is ingested.
+
+        Returns:
+            None: This function does not return anything.
+        """
+        version = [1]
+        cache = ResponseCache(version_source=lambda: version[0], version_check_interval=0.0)
+
+        cache.get_or_compute('key', lambda: 'old')
+        self.assertEqual(cache.get_or_compute('key', lambda: 'new'), ('old', 'hit'))
+
+        version[0] = 2
+        self.assertEqual(cache.get_or_compute('key', lambda: 'new'), ('new', 'miss'))
+        self.assertEqual(cache.stats()['invalidations'], 1)
+
+    def test_concurrent_requests_are_coalesced(self) -> None:
+        """
+        Test that concurrent misses on the same key run the computation once and share its result.
+
+        Returns:
+            None: This function does not return anything.
+        """
+        cache = ResponseCache()
+        calls: List[int] = []
+        statuses: List[str] = []
+
+        def compute() -> str:
+            calls.append(1)
+            time.sleep(0.2)
+            return 'value'
+
+        def request() -> None:
+            value, status = cache.get_or_compute('key', compute)
+            self.assertEqual(value, 'value')
+            statuses.append(status)
+
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(statuses), ['coalesced'] * 7 + ['miss'])
+
+    def test_errors_are_shared_and_not_cached(self) -> None:
+        """
+        Test that a failed computation raises for the caller and is retried on the next lookup.
+
+        Returns:
+            None: This function does not return anything.
+        """
+        cache = ResponseCache()
+
+        def fail() -> str:
+            raise ValueError("port not found")
+
+        with self.assertRaises(ValueError):
+            cache.get_or_compute('key', fail)
+        self.assertEqual(cache.get_or_compute('key', lambda: 'value'), ('value', 'miss'))
+
+if __name__ == '__main__':
+    unittest.main()